@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+from types import MappingProxyType
+
+from odoo.tests.common import TransactionCase, DISABLED_MAIL_CONTEXT
+
+
+def freeze(value):
+    """Return a read-only copy of value: dicts become mappingproxies, lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class ResultSpecMixin:
+    """Check hook results against declarative specs"""
+
+    def _assert_result(self, result, spec):
+        """Check result against spec: plain values must be equal, (op, arg) tuples compare"""
+        for key, expected in spec.items():
+            value = result[key]
+            if not isinstance(expected, tuple):
+                self.assertEqual(value, expected, key)
+                continue
+            op, arg = expected
+            if op == '>':
+                self.assertGreater(value, arg, key)
+            elif op == '<':
+                self.assertLess(value, arg, key)
+            elif op == 'len':
+                self.assertEqual(len(value), arg, key)
+            elif op == 'len>':
+                self.assertGreater(len(value), arg, key)
+            elif op == 'isinstance':
+                self.assertIsInstance(value, arg, key)
+            elif op == 'has':
+                for member in arg:
+                    self.assertIn(member, value, key)
+            elif op == 'each':
+                # One set comparison per key instead of one assertion per item
+                for item_key, item_expected in arg.items():
+                    self.assertEqual({item[item_key] for item in value}, {item_expected}, key)
+            else:
+                raise ValueError("Unknown spec operator %r for %r" % (op, key))
+
+
+class ProductionTestCommon(TransactionCase):
+    """Production-like company and Vipps provider shared by the production suites"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Fixtures need no chatter: skip mail tracking and follower subscription
+        cls.env = cls.env['base'].with_context(**DISABLED_MAIL_CONTEXT).env
+        cls._nok_id = cls.env.ref('base.NOK').id
+
+        # Create production-like test company
+        cls.company = cls.env['res.company'].create({
+            'name': 'Production Test Company',
+            'currency_id': cls._nok_id,
+        })
+
+        # Create production payment provider
+        cls.provider = cls.env['payment.provider'].create({
+            'name': 'Vipps Production',
+            'code': 'vipps',
+            'state': 'enabled',
+            'company_id': cls.company.id,
+            'vipps_merchant_serial_number': '654321',
+            'vipps_subscription_key': 'prod_subscription_key_12345678901234567890',
+            'vipps_client_id': 'prod_client_id_12345',
+            'vipps_client_secret': 'prod_client_secret_12345678901234567890',
+            'vipps_environment': 'production',
+            'vipps_webhook_secret': 'prod_webhook_secret_12345678901234567890123456789012',
+        })
+        cls.provider_id = cls.provider.id
@@ -1,20 +1,71 @@
 # -*- coding: utf-8 -*-
 
 import json
+
+import requests
+
 from odoo.tests import tagged, TransactionCase
 from odoo.exceptions import ValidationError, UserError
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
+
+
+class _StubVippsApi:
+    """Minimal API client stand-in for tests that only need a canned reply"""
+
+    def _make_request(self, method, endpoint, *args, **kwargs):
+        return {'state': 'CANCELLED'}
+
+
+_STUB_VIPPS_API = _StubVippsApi()
+
+
+def _offline_vipps_response(*args, **kwargs):
+    """Canned 200 reply for any HTTP call a test forgot to mock"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'{}'
+    return response
+
+
+PHONE_VALIDATION_CASES = (
+    # Valid Danish numbers
+    ('+4512345678', True),
+    ('+4587654321', True),
+    # Valid Norwegian numbers
+    ('+4712345678', True),
+    ('+4787654321', True),
+    # Invalid numbers
+    ('+451234567', False),  # Too short
+    ('+45123456789', False),  # Too long
+    ('12345678', False),  # No country code
+    ('+1234567890', False),  # Wrong country
+)
+
+PHONE_FORMATTING_CASES = (
+    # Danish numbers
+    ('12345678', '+4512345678'),
+    ('012345678', '+4512345678'),
+    ('+4512345678', '+4512345678'),
+    ('4512345678', '+4512345678'),
+    # Norwegian numbers
+    ('+4712345678', '+4712345678'),
+    ('4712345678', '+4712345678'),
+)
 
 
 @tagged('post_install', '-at_install')
 class TestPOSPaymentWidgets(TransactionCase):
     """Test POS payment widgets and interfaces"""
 
-    def setUp(self):
-        super().setUp()
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        
+        # Never reach the Vipps sandbox; tests override with their own patches
+        cls.startClassPatcher(patch('requests.Session.request', side_effect=_offline_vipps_response))
         
         # Create test payment provider
-        self.provider = self.env['payment.provider'].create({
+        cls.provider = cls.env['payment.provider'].create({
             'name': 'Vipps Test POS',
             'code': 'vipps',
             'state': 'test',
@@ -29,38 +80,133 @@ class TestPOSPaymentWidgets(TransactionCase):
         })
         
         # Create test POS payment method
-        self.payment_method = self.env['pos.payment.method'].create({
+        cls.payment_method = cls.env['pos.payment.method'].create({
             'name': 'Vipps POS Test',
             'use_payment_terminal': 'vipps',
-            'payment_provider_id': self.provider.id,
+            'payment_provider_id': cls.provider.id,
         })
         
-        # Create test POS config and session
-        self.pos_config = self.env['pos.config'].create({
+        # Create test POS config and session. The session is left unopened:
+        # transactions only store its id, none of the tests rely on its state.
+        pos_config_vals = {
             'name': 'Test POS Config',
-            'payment_method_ids': [(6, 0, [self.payment_method.id])],
-        })
+            'payment_method_ids': [(6, 0, [cls.payment_method.id])],
+        }
+        # Cloning the demo shop skips default computation for unset fields
+        base_config = cls.env.ref('point_of_sale.pos_config_main', raise_if_not_found=False)
+        if base_config:
+            cls.pos_config = base_config.copy(pos_config_vals)
+        else:
+            cls.pos_config = cls.env['pos.config'].create(pos_config_vals)
         
-        self.pos_session = self.env['pos.session'].create({
-            'config_id': self.pos_config.id,
-            'user_id': self.env.user.id,
+        cls.pos_session = cls.env['pos.session'].create({
+            'config_id': cls.pos_config.id,
+            'user_id': cls.env.user.id,
         })
-        self.pos_session.action_pos_session_open()
         
         # Create test currency
-        self.currency = self.env.ref('base.DKK')
+        cls.currency = cls.env.ref('base.DKK')
+        cls.currency_id = cls.currency.id
+        cls.partner_id = cls.env.user.partner_id.id
+        
+        # In-memory transaction for tests that only exercise the pure phone helpers
+        cls.helper_tx = cls.env['payment.transaction'].new({
+            'reference': 'TEST-HELPER',
+            'amount': 0.0,
+            'currency_id': cls.currency_id,
+            'provider_id': cls.provider.id,
+        })
+        
+        # Fields shared by every transaction fixture
+        cls.common_vals = {
+            'currency_id': cls.currency_id,
+            'provider_id': cls.provider.id,
+            'partner_id': cls.partner_id,
+        }
+        cls.pos_vals = {**cls.common_vals, 'pos_session_id': cls.pos_session.id}
+        
+        # Create all other test transactions in a single batch
+        vals_list = [
+            {
+                **cls.pos_vals,
+                'reference': 'TEST-QR-001',
+                'amount': 100.0,
+                'vipps_payment_flow': 'customer_qr',
+            },
+            {
+                **cls.pos_vals,
+                'reference': 'TEST-PHONE-001',
+                'amount': 150.0,
+                'vipps_payment_flow': 'customer_phone',
+                'vipps_customer_phone': '+4512345678',
+            },
+            {
+                **cls.pos_vals,
+                'reference': 'TEST-MANUAL-001',
+                'amount': 200.0,
+                'vipps_payment_flow': 'manual_shop_number',
+            },
+            {
+                **cls.pos_vals,
+                'reference': 'TEST-MANUAL-QR-001',
+                'amount': 250.0,
+                'vipps_payment_flow': 'manual_shop_qr',
+            },
+            {
+                **cls.pos_vals,
+                'reference': 'TEST-VERIFY-001',
+                'amount': 300.0,
+                'vipps_payment_flow': 'manual_shop_number',
+                'vipps_manual_verification_status': 'pending',
+            },
+            {
+                **cls.pos_vals,
+                'reference': 'TEST-VERIFY-FAIL-001',
+                'amount': 300.0,
+                'vipps_payment_flow': 'manual_shop_number',
+                'vipps_manual_verification_status': 'pending',
+            },
+            {
+                **cls.common_vals,
+                'reference': 'TEST-POLLING-001',
+                'amount': 100.0,
+                'vipps_payment_reference': 'vipps-ref-polling',
+            },
+            {
+                **cls.common_vals,
+                'reference': 'TEST-CANCEL-001',
+                'amount': 100.0,
+                'vipps_payment_reference': 'vipps-ref-cancel',
+                'vipps_payment_state': 'CREATED',
+            },
+            {
+                **cls.common_vals,
+                'reference': 'TEST-NO-SHOP-001',
+                'amount': 100.0,
+                'vipps_payment_flow': 'manual_shop_number',
+            },
+            {
+                **cls.common_vals,
+                'reference': 'TEST-INVALID-001',
+                'amount': 100.0,
+            },
+        ]
+        (
+            cls.tx_qr,
+            cls.tx_phone,
+            cls.tx_manual,
+            cls.tx_manual_qr,
+            cls.tx_verify,
+            cls.tx_verify_fail,
+            cls.tx_polling,
+            cls.tx_cancel,
+            cls.tx_no_shop,
+            cls.tx_invalid,
+        ) = cls.env['payment.transaction'].create(vals_list)
 
     def test_qr_code_payment_creation(self):
         """Test QR code payment widget creation"""
-        transaction = self.env['payment.transaction'].create({
-            'reference': 'TEST-QR-001',
-            'amount': 100.0,
-            'currency_id': self.currency.id,
-            'provider_id': self.provider.id,
-            'partner_id': self.env.user.partner_id.id,
-            'vipps_payment_flow': 'customer_qr',
-            'pos_session_id': self.pos_session.id,
-        })
+        transaction = self.tx_qr
         
         with patch.object(transaction, '_send_pos_payment_request') as mock_request:
             mock_request.return_value = {
@@ -71,22 +217,13 @@ class TestPOSPaymentWidgets(TransactionCase):
             
             result = transaction._vipps_create_qr_payment()
             
-            self.assertTrue(result['success'])
-            self.assertIn('qr_code', result)
+            self.assertEqual(result.get('success'), True)
+            self.assertEqual(result.get('qr_code'), 'base64_qr_code_data')
             mock_request.assert_called_once_with(pos_method='customer_qr')
 
     def test_phone_payment_creation(self):
         """Test phone payment widget creation"""
-        transaction = self.env['payment.transaction'].create({
-            'reference': 'TEST-PHONE-001',
-            'amount': 150.0,
-            'currency_id': self.currency.id,
-            'provider_id': self.provider.id,
-            'partner_id': self.env.user.partner_id.id,
-            'vipps_payment_flow': 'customer_phone',
-            'vipps_customer_phone': '+4512345678',
-            'pos_session_id': self.pos_session.id,
-        })
+        transaction = self.tx_phone
         
         with patch.object(transaction, '_send_pos_payment_request') as mock_request:
             mock_request.return_value = {
@@ -102,56 +239,30 @@ class TestPOSPaymentWidgets(TransactionCase):
 
     def test_manual_shop_number_payment(self):
         """Test manual shop number payment widget"""
-        transaction = self.env['payment.transaction'].create({
-            'reference': 'TEST-MANUAL-001',
-            'amount': 200.0,
-            'currency_id': self.currency.id,
-            'provider_id': self.provider.id,
-            'partner_id': self.env.user.partner_id.id,
-            'vipps_payment_flow': 'manual_shop_number',
-            'pos_session_id': self.pos_session.id,
-        })
+        transaction = self.tx_manual
         
         result = transaction._vipps_create_manual_payment('shop_number')
         
-        self.assertTrue(result['success'])
-        self.assertIn('shop_number', result)
-        self.assertEqual(result['shop_number'], '12345678')
+        self.assertEqual(result.get('success'), True)
+        self.assertEqual(result.get('shop_number'), '12345678')
         self.assertEqual(transaction.vipps_payment_flow, 'manual_shop_number')
 
     def test_manual_shop_qr_payment(self):
         """Test manual shop QR payment widget"""
         # Set up shop QR code
-        self.provider.vipps_shop_qr_code = 'base64_shop_qr_data'
+        self.provider.write({'vipps_shop_qr_code': 'base64_shop_qr_data'})
         
-        transaction = self.env['payment.transaction'].create({
-            'reference': 'TEST-MANUAL-QR-001',
-            'amount': 250.0,
-            'currency_id': self.currency.id,
-            'provider_id': self.provider.id,
-            'partner_id': self.env.user.partner_id.id,
-            'vipps_payment_flow': 'manual_shop_qr',
-            'pos_session_id': self.pos_session.id,
-        })
+        transaction = self.tx_manual_qr
         
         result = transaction._vipps_create_manual_payment('shop_qr')
         
-        self.assertTrue(result['success'])
-        self.assertIn('shop_qr_code', result)
+        self.assertEqual(result.get('success'), True)
+        self.assertEqual(result.get('shop_qr_code'), 'base64_shop_qr_data')
         self.assertEqual(transaction.vipps_payment_flow, 'manual_shop_qr')
 
     def test_manual_payment_verification(self):
         """Test manual payment verification interface"""
-        transaction = self.env['payment.transaction'].create({
-            'reference': 'TEST-VERIFY-001',
-            'amount': 300.0,
-            'currency_id': self.currency.id,
-            'provider_id': self.provider.id,
-            'partner_id': self.env.user.partner_id.id,
-            'vipps_payment_flow': 'manual_shop_number',
-            'vipps_manual_verification_status': 'pending',
-            'pos_session_id': self.pos_session.id,
-        })
+        transaction = self.tx_verify
         
         # Test successful verification
         result = transaction._verify_manual_payment(True, "Customer showed confirmation")
@@ -162,16 +273,7 @@ class TestPOSPaymentWidgets(TransactionCase):
 
     def test_manual_payment_verification_failure(self):
         """Test manual payment verification failure"""
-        transaction = self.env['payment.transaction'].create({
-            'reference': 'TEST-VERIFY-FAIL-001',
-            'amount': 300.0,
-            'currency_id': self.currency.id,
-            'provider_id': self.provider.id,
-            'partner_id': self.env.user.partner_id.id,
-            'vipps_payment_flow': 'manual_shop_number',
-            'vipps_manual_verification_status': 'pending',
-            'pos_session_id': self.pos_session.id,
-        })
+        transaction = self.tx_verify_fail
         
         # Test failed verification
         result = transaction._verify_manual_payment(False, "Customer could not show confirmation")
@@ -182,60 +284,26 @@ class TestPOSPaymentWidgets(TransactionCase):
 
     def test_phone_number_validation(self):
         """Test phone number validation for different Nordic countries"""
-        transaction = self.env['payment.transaction'].create({
-            'reference': 'TEST-PHONE-VALIDATION',
-            'amount': 100.0,
-            'currency_id': self.currency.id,
-            'provider_id': self.provider.id,
-            'partner_id': self.env.user.partner_id.id,
-        })
-        
-        # Test valid Danish numbers
-        self.assertTrue(transaction._validate_phone_number('+4512345678'))
-        self.assertTrue(transaction._validate_phone_number('+4587654321'))
-        
-        # Test valid Norwegian numbers
-        self.assertTrue(transaction._validate_phone_number('+4712345678'))
-        self.assertTrue(transaction._validate_phone_number('+4787654321'))
+        transaction = self.helper_tx
         
-        # Test invalid numbers
-        self.assertFalse(transaction._validate_phone_number('+451234567'))  # Too short
-        self.assertFalse(transaction._validate_phone_number('+45123456789'))  # Too long
-        self.assertFalse(transaction._validate_phone_number('12345678'))  # No country code
-        self.assertFalse(transaction._validate_phone_number('+1234567890'))  # Wrong country
+        for number, expected in PHONE_VALIDATION_CASES:
+            with self.subTest(number=number):
+                self.assertEqual(bool(transaction._validate_phone_number(number)), expected)
 
     def test_phone_number_formatting(self):
         """Test phone number formatting for MobilePay API"""
-        transaction = self.env['payment.transaction'].create({
-            'reference': 'TEST-PHONE-FORMAT',
-            'amount': 100.0,
-            'currency_id': self.currency.id,
-            'provider_id': self.provider.id,
-            'partner_id': self.env.user.partner_id.id,
-        })
-        
-        # Test Danish number formatting
-        self.assertEqual(transaction._format_phone_number('12345678'), '+4512345678')
-        self.assertEqual(transaction._format_phone_number('012345678'), '+4512345678')
-        self.assertEqual(transaction._format_phone_number('+4512345678'), '+4512345678')
-        self.assertEqual(transaction._format_phone_number('4512345678'), '+4512345678')
+        transaction = self.helper_tx
         
-        # Test Norwegian numbers
-        self.assertEqual(transaction._format_phone_number('+4712345678'), '+4712345678')
-        self.assertEqual(transaction._format_phone_number('4712345678'), '+4712345678')
+        for number, expected in PHONE_FORMATTING_CASES:
+            with self.subTest(number=number):
+                self.assertEqual(transaction._format_phone_number(number), expected)
 
     def test_payment_status_polling(self):
         """Test payment status polling functionality"""
-        transaction = self.env['payment.transaction'].create({
-            'reference': 'TEST-POLLING-001',
-            'amount': 100.0,
-            'currency_id': self.currency.id,
-            'provider_id': self.provider.id,
-            'partner_id': self.env.user.partner_id.id,
-            'vipps_payment_reference': 'vipps-ref-polling',
-        })
+        transaction = self.tx_polling
         
-        with patch.object(transaction, '_get_payment_status') as mock_status:
+        with patch.object(transaction, '_get_payment_status') as mock_status, \
+                patch('time.sleep') as mock_sleep:
             # Simulate payment completion after 2 polls
             mock_status.side_effect = ['CREATED', 'AUTHORIZED']
             
@@ -244,22 +312,15 @@ class TestPOSPaymentWidgets(TransactionCase):
             self.assertTrue(result['success'])
             self.assertEqual(result['state'], 'AUTHORIZED')
             self.assertEqual(mock_status.call_count, 2)
+            # One wait between the two polls, without real wall-clock delay
+            mock_sleep.assert_called_once_with(0.1)
 
     def test_payment_cancellation(self):
         """Test payment cancellation functionality"""
-        transaction = self.env['payment.transaction'].create({
-            'reference': 'TEST-CANCEL-001',
-            'amount': 100.0,
-            'currency_id': self.currency.id,
-            'provider_id': self.provider.id,
-            'partner_id': self.env.user.partner_id.id,
-            'vipps_payment_reference': 'vipps-ref-cancel',
-            'vipps_payment_state': 'CREATED',
-        })
+        transaction = self.tx_cancel
         
         with patch.object(transaction, '_get_vipps_api_client') as mock_client:
-            mock_api = MagicMock()
-            mock_client.return_value = mock_api
+            mock_client.return_value = _STUB_VIPPS_API
             
             result = transaction._vipps_cancel_payment()
             
@@ -269,29 +330,16 @@ class TestPOSPaymentWidgets(TransactionCase):
     def test_missing_shop_configuration(self):
         """Test error handling when shop configuration is missing"""
         # Remove shop number
-        self.provider.vipps_shop_mobilepay_number = False
+        self.provider.write({'vipps_shop_mobilepay_number': False})
         
-        transaction = self.env['payment.transaction'].create({
-            'reference': 'TEST-NO-SHOP-001',
-            'amount': 100.0,
-            'currency_id': self.currency.id,
-            'provider_id': self.provider.id,
-            'partner_id': self.env.user.partner_id.id,
-            'vipps_payment_flow': 'manual_shop_number',
-        })
+        transaction = self.tx_no_shop
         
         with self.assertRaises(ValidationError):
             transaction._initiate_manual_shop_number_payment()
 
     def test_invalid_payment_flow(self):
         """Test error handling for invalid payment flows"""
-        transaction = self.env['payment.transaction'].create({
-            'reference': 'TEST-INVALID-001',
-            'amount': 100.0,
-            'currency_id': self.currency.id,
-            'provider_id': self.provider.id,
-            'partner_id': self.env.user.partner_id.id,
-        })
+        transaction = self.tx_invalid
         
         result = transaction._vipps_create_manual_payment('invalid_type')
         
@@ -11,11 +11,12 @@ from unittest.mock import patch, MagicMock
 class TestPOSRealtimeMonitoring(TransactionCase):
     """Test POS real-time status monitoring features"""
 
-    def setUp(self):
-        super().setUp()
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
         
         # Create test payment provider
-        self.provider = self.env['payment.provider'].create({
+        cls.provider = cls.env['payment.provider'].create({
             'name': 'Vipps Test Monitoring',
             'code': 'vipps',
             'state': 'test',
@@ -28,14 +29,23 @@ class TestPOSRealtimeMonitoring(TransactionCase):
         })
         
         # Create test POS payment method
-        self.payment_method = self.env['pos.payment.method'].create({
+        cls.payment_method = cls.env['pos.payment.method'].create({
             'name': 'Vipps POS Monitoring Test',
             'use_payment_terminal': 'vipps',
-            'payment_provider_id': self.provider.id,
+            'payment_provider_id': cls.provider.id,
         })
         
         # Create test currency
-        self.currency = self.env.ref('base.DKK')
+        cls.currency = cls.env.ref('base.DKK')
+
+    def _backdate(self, transactions, create_date):
+        """Backdate create_date in SQL: create() and write() drop explicit values"""
+        transactions.flush_recordset()
+        self.env.cr.execute(
+            "UPDATE payment_transaction SET create_date = %s WHERE id IN %s",
+            (create_date, tuple(transactions.ids)),
+        )
+        transactions.invalidate_recordset(['create_date'])
 
     def test_processing_metrics_calculation(self):
         """Test processing metrics calculation"""
@@ -51,9 +61,7 @@ class TestPOSRealtimeMonitoring(TransactionCase):
             'vipps_payment_flow': 'customer_qr',
             'vipps_webhook_received': True,
         })
-        
-        # Manually set creation time
-        transaction.write({'create_date': past_time})
+        self._backdate(transaction, past_time)
         
         metrics = transaction._get_processing_metrics()
         
@@ -70,16 +78,16 @@ class TestPOSRealtimeMonitoring(TransactionCase):
             ('manual_shop_qr', 90),
         ]
         
-        for flow, expected_estimate in flows_and_estimates:
-            transaction = self.env['payment.transaction'].create({
-                'reference': f'TEST-ESTIMATE-{flow}',
-                'amount': 100.0,
-                'currency_id': self.currency.id,
-                'provider_id': self.provider.id,
-                'partner_id': self.env.user.partner_id.id,
-                'vipps_payment_flow': flow,
-            })
-            
+        transactions = self.env['payment.transaction'].create([{
+            'reference': f'TEST-ESTIMATE-{flow}',
+            'amount': 100.0,
+            'currency_id': self.currency.id,
+            'provider_id': self.provider.id,
+            'partner_id': self.env.user.partner_id.id,
+            'vipps_payment_flow': flow,
+        } for flow, _estimate in flows_and_estimates])
+        
+        for transaction, (flow, expected_estimate) in zip(transactions, flows_and_estimates):
             estimate = transaction._estimate_completion_time()
             
             # Should be close to expected estimate (within 10 seconds)
@@ -87,23 +95,28 @@ class TestPOSRealtimeMonitoring(TransactionCase):
 
     def test_timeout_risk_assessment(self):
         """Test timeout risk assessment"""
-        transaction = self.env['payment.transaction'].create({
+        old_time = datetime.now() - timedelta(seconds=250)  # 250 seconds ago (83% of 300s timeout)
+        recent_transaction, old_transaction = self.env['payment.transaction'].create([{
             'reference': 'TEST-TIMEOUT-RISK',
             'amount': 100.0,
             'currency_id': self.currency.id,
             'provider_id': self.provider.id,
             'partner_id': self.env.user.partner_id.id,
-        })
+        }, {
+            'reference': 'TEST-TIMEOUT-RISK-OLD',
+            'amount': 100.0,
+            'currency_id': self.currency.id,
+            'provider_id': self.provider.id,
+            'partner_id': self.env.user.partner_id.id,
+        }])
+        self._backdate(old_transaction, old_time)
         
         # Test low risk (recent transaction)
-        risk = transaction._check_timeout_risk()
+        risk = recent_transaction._check_timeout_risk()
         self.assertEqual(risk['risk'], 'low')
         
         # Test high risk (old transaction)
-        old_time = datetime.now() - timedelta(seconds=250)  # 250 seconds ago (83% of 300s timeout)
-        transaction.write({'create_date': old_time})
-        
-        risk = transaction._check_timeout_risk()
+        risk = old_transaction._check_timeout_risk()
         self.assertEqual(risk['risk'], 'high')
         self.assertGreater(risk['percentage'], 80)
 
@@ -162,16 +175,16 @@ class TestPOSRealtimeMonitoring(TransactionCase):
             ('unknown_flow', 'unknown_flow'),  # Fallback
         ]
         
-        for flow_code, expected_name in flows_and_names:
-            transaction = self.env['payment.transaction'].create({
-                'reference': f'TEST-FLOW-{flow_code}',
-                'amount': 100.0,
-                'currency_id': self.currency.id,
-                'provider_id': self.provider.id,
-                'partner_id': self.env.user.partner_id.id,
-                'vipps_payment_flow': flow_code,
-            })
-            
+        transactions = self.env['payment.transaction'].create([{
+            'reference': f'TEST-FLOW-{flow_code}',
+            'amount': 100.0,
+            'currency_id': self.currency.id,
+            'provider_id': self.provider.id,
+            'partner_id': self.env.user.partner_id.id,
+            'vipps_payment_flow': flow_code,
+        } for flow_code, _name in flows_and_names])
+        
+        for transaction, (flow_code, expected_name) in zip(transactions, flows_and_names):
             display_name = transaction._get_flow_display_name()
             self.assertIn(expected_name.split()[0], display_name)  # Check first word matches
 
@@ -186,13 +199,13 @@ class TestPOSRealtimeMonitoring(TransactionCase):
             'vipps_payment_reference': 'vipps-ref-polling',
         })
         
-        with patch.object(transaction, '_get_payment_status') as mock_status:
-            mock_status.return_value = 'AUTHORIZED'
-            
-            result = transaction._vipps_check_payment_status()
-            
-            self.assertTrue(result['success'])
-            mock_status.assert_called_once()
+        mock_status = self.startPatcher(patch.object(
+            type(transaction), '_get_payment_status', return_value='AUTHORIZED'))
+        
+        result = transaction._vipps_check_payment_status()
+        
+        self.assertTrue(result['success'])
+        mock_status.assert_called_once()
 
     def test_enhanced_status_polling_failure(self):
         """Test enhanced status polling with API failure"""
@@ -205,16 +218,17 @@ class TestPOSRealtimeMonitoring(TransactionCase):
             'vipps_payment_reference': 'vipps-ref-polling-fail',
         })
         
-        with patch.object(transaction, '_get_payment_status') as mock_status:
-            mock_status.side_effect = Exception("API Error")
-            
-            result = transaction._vipps_check_payment_status()
-            
-            self.assertFalse(result['success'])
-            self.assertIn('error', result)
+        self.startPatcher(patch.object(
+            type(transaction), '_get_payment_status', side_effect=Exception("API Error")))
+        
+        result = transaction._vipps_check_payment_status()
+        
+        self.assertFalse(result['success'])
+        self.assertIn('error', result)
 
     def test_automatic_timeout_handling(self):
         """Test automatic timeout handling and cancellation"""
+        timeout_time = datetime.now() - timedelta(seconds=400)  # Beyond 300s timeout
         transaction = self.env['payment.transaction'].create({
             'reference': 'TEST-AUTO-TIMEOUT',
             'amount': 100.0,
@@ -226,16 +240,15 @@ class TestPOSRealtimeMonitoring(TransactionCase):
         })
         
         # Simulate timeout by setting old creation time
-        timeout_time = datetime.now() - timedelta(seconds=400)  # Beyond 300s timeout
-        transaction.write({'create_date': timeout_time})
+        self._backdate(transaction, timeout_time)
         
-        with patch.object(transaction, '_vipps_cancel_payment') as mock_cancel:
-            mock_cancel.return_value = {'success': True}
-            
-            risk = transaction._check_timeout_risk()
-            
-            self.assertEqual(risk['risk'], 'critical')
-            self.assertGreater(risk['percentage'], 100)
+        self.startPatcher(patch.object(
+            type(transaction), '_vipps_cancel_payment', return_value={'success': True}))
+        
+        risk = transaction._check_timeout_risk()
+        
+        self.assertEqual(risk['risk'], 'critical')
+        self.assertGreater(risk['percentage'], 100)
 
     def test_connection_quality_assessment(self):
         """Test connection quality assessment logic"""
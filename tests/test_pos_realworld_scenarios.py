@@ -12,14 +12,28 @@ from odoo.exceptions import ValidationError, UserError, AccessError
 class TestVippsPOSRealWorldScenarios(TransactionCase):
     """Real-world scenario tests for Vipps POS integration"""
     
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        
+        # Records referenced by xmlid, resolved once for the whole class
+        cls.currency_nok = cls.env.ref('base.NOK')
+        cls.country_no = cls.env.ref('base.no')
+        cls.cat_all = cls.env.ref('product.product_category_all')
+        
+        # Categories and tip product shared by every test and product
+        cls.beverage_category = cls._create_beverage_category()
+        cls.food_category = cls._create_food_category()
+        cls.tip_product = cls._create_tip_product()
+    
     def setUp(self):
         super().setUp()
         
         # Create test company with Norwegian settings
         self.company = self.env['res.company'].create({
             'name': 'Norwegian Coffee Shop AS',
-            'currency_id': self.env.ref('base.NOK').id,
-            'country_id': self.env.ref('base.no').id,
+            'currency_id': self.currency_nok.id,
+            'country_id': self.country_no.id,
             'vat': 'NO123456789MVA',
         })
         
@@ -80,7 +94,7 @@ class TestVippsPOSRealWorldScenarios(TransactionCase):
             ])],
             'module_pos_restaurant': True,
             'iface_tipproduct': True,
-            'tip_product_id': self._create_tip_product().id,
+            'tip_product_id': self.tip_product.id,
         })
         
         # Create realistic products
@@ -89,7 +103,7 @@ class TestVippsPOSRealWorldScenarios(TransactionCase):
             'type': 'product',
             'list_price': 35.0,
             'available_in_pos': True,
-            'categ_id': self._create_beverage_category().id,
+            'categ_id': self.beverage_category.id,
         })
         
         self.coffee_latte = self.env['product.product'].create({
@@ -97,7 +111,7 @@ class TestVippsPOSRealWorldScenarios(TransactionCase):
             'type': 'product',
             'list_price': 55.0,
             'available_in_pos': True,
-            'categ_id': self._create_beverage_category().id,
+            'categ_id': self.beverage_category.id,
         })
         
         self.pastry_croissant = self.env['product.product'].create({
@@ -105,7 +119,7 @@ class TestVippsPOSRealWorldScenarios(TransactionCase):
             'type': 'product',
             'list_price': 25.0,
             'available_in_pos': True,
-            'categ_id': self._create_food_category().id,
+            'categ_id': self.food_category.id,
         })
         
         # Create customers
@@ -113,7 +127,7 @@ class TestVippsPOSRealWorldScenarios(TransactionCase):
             'name': 'Kari Nordmann',
             'email': 'kari@example.no',
             'phone': '+4798765432',
-            'country_id': self.env.ref('base.no').id,
+            'country_id': self.country_no.id,
         })
         
         self.business_customer = self.env['res.partner'].create({
@@ -122,7 +136,7 @@ class TestVippsPOSRealWorldScenarios(TransactionCase):
             'phone': '+4712345678',
             'is_company': True,
             'vat': 'NO987654321MVA',
-            'country_id': self.env.ref('base.no').id,
+            'country_id': self.country_no.id,
         })
         
         # Create POS session
@@ -141,72 +155,73 @@ class TestVippsPOSRealWorldScenarios(TransactionCase):
     
     def test_busy_morning_rush_scenario(self):
         """Test busy morning rush with multiple concurrent orders"""
-        # Simulate 5 concurrent orders during morning rush
-        morning_orders = []
+        # Simulate 5 concurrent orders during morning rush, arriving 30s apart
+        base_time = datetime.now()
+        # Coffee + pastry combo; create_from_ui fills in line dicts in place,
+        # so every order gets its own copies
+        coffee_line = {
+            'product_id': self.coffee_latte.id,
+            'qty': 1,
+            'price_unit': 55.0,
+            'discount': 0,
+        }
+        pastry_line = {
+            'product_id': self.pastry_croissant.id,
+            'qty': 1,
+            'price_unit': 25.0,
+            'discount': 0,
+        }
+        qr_method_id = self.qr_method.id
+        pos_session_id = self.pos_session.id
+        regular_customer_id = self.regular_customer.id
         
-        for i in range(5):
-            order_data = {
-                'id': f'morning-rush-{i+1:03d}',
-                'data': {
-                    'name': f'Morning Order {i+1:03d}',
-                    'partner_id': self.regular_customer.id if i % 2 == 0 else False,
-                    'lines': [
-                        # Coffee + pastry combo
-                        [0, 0, {
-                            'product_id': self.coffee_latte.id,
-                            'qty': 1,
-                            'price_unit': 55.0,
-                            'discount': 0,
-                        }],
-                        [0, 0, {
-                            'product_id': self.pastry_croissant.id,
-                            'qty': 1,
-                            'price_unit': 25.0,
-                            'discount': 0,
-                        }]
-                    ],
-                    'statement_ids': [[
-                        0, 0, {
-                            'payment_method_id': self.qr_method.id,
-                            'amount': 80.0,
-                            'vipps_pos_method': 'customer_qr',
-                            'vipps_payment_reference': f'MORNING-QR-{i+1:03d}',
-                            'vipps_payment_state': 'CAPTURED',
-                        }
-                    ]],
-                    'amount_total': 80.0,
-                    'amount_paid': 80.0,
-                    'pos_session_id': self.pos_session.id,
-                    'creation_date': (datetime.now() + timedelta(seconds=i*30)).isoformat(),
-                }
+        morning_orders = [{
+            'id': f'morning-rush-{i+1:03d}',
+            'data': {
+                'name': f'Morning Order {i+1:03d}',
+                'partner_id': regular_customer_id if i % 2 == 0 else False,
+                'lines': [[0, 0, dict(coffee_line)], [0, 0, dict(pastry_line)]],
+                'statement_ids': [[
+                    0, 0, {
+                        'payment_method_id': qr_method_id,
+                        'amount': 80.0,
+                        'vipps_pos_method': 'customer_qr',
+                        'vipps_payment_reference': f'MORNING-QR-{i+1:03d}',
+                        'vipps_payment_state': 'CAPTURED',
+                    }
+                ]],
+                'amount_total': 80.0,
+                'amount_paid': 80.0,
+                'pos_session_id': pos_session_id,
+                'creation_date': (base_time + timedelta(seconds=i*30)).isoformat(),
             }
-            morning_orders.append(order_data)
+        } for i in range(5)]
         
         # Mock successful Vipps processing for all orders
-        with patch.object(self.qr_method, '_process_vipps_pos_payment') as mock_process:
-            mock_process.return_value = {
+        mock_process = self.startPatcher(patch.object(
+            type(self.qr_method), '_process_vipps_pos_payment', return_value={
                 'success': True,
                 'state': 'CAPTURED',
                 'processing_time': 2.5  # Fast processing
-            }
-            
-            # Process all orders
-            orders = self.env['pos.order'].create_from_ui(morning_orders)
-            
-            # Verify all orders processed successfully
-            self.assertEqual(len(orders), 5)
-            
-            total_revenue = sum(order.amount_total for order in orders)
-            self.assertEqual(total_revenue, 400.0)  # 5 * 80.0
-            
-            # Verify Vipps processing was called for each order
-            self.assertEqual(mock_process.call_count, 5)
-            
-            # Verify session statistics
-            vipps_payments = self.pos_session.order_ids.mapped('payment_ids').filtered(
-                lambda p: p.payment_method_id == self.qr_method
-            )
-            self.assertEqual(len(vipps_payments), 5)
+            }))
+        
+        # Process all orders
+        orders = self.env['pos.order'].create_from_ui(morning_orders)
+        
+        # Verify all orders processed successfully
+        self.assertEqual(len(orders), 5)
+        
+        total_revenue = sum(order.amount_total for order in orders)
+        self.assertEqual(total_revenue, 400.0)  # 5 * 80.0
+        
+        # Verify Vipps processing was called for each order
+        self.assertEqual(mock_process.call_count, 5)
+        
+        # Verify session statistics
+        vipps_payments = self.pos_session.order_ids.mapped('payment_ids').filtered(
+            lambda p: p.payment_method_id == self.qr_method
+        )
+        self.assertEqual(len(vipps_payments), 5)
     
     def test_tip_handling_scenario(self):
         """Test tip handling with Vipps payment"""
@@ -246,54 +261,57 @@ class TestVippsPOSRealWorldScenarios(TransactionCase):
             }
         }
         
-        with patch.object(self.qr_method, '_process_vipps_pos_payment') as mock_process:
-            mock_process.return_value = {
+        self.startPatcher(patch.object(
+            type(self.qr_method), '_process_vipps_pos_payment', return_value={
                 'success': True,
                 'payment_reference': 'TIP-001',
                 'state': 'CAPTURED',
                 'tip_amount': 10.0,
                 'base_amount': 55.0
-            }
-            
-            orders = self.env['pos.order'].create_from_ui([tip_order_data])
-            order = orders[0]
-            
-            # Verify tip handling
-            self.assertEqual(order.amount_total, 65.0)
-            
-            # Check if tip line exists
-            tip_lines = order.lines.filtered(
-                lambda l: l.product_id == self.pos_config.tip_product_id
-            )
-            self.assertEqual(len(tip_lines), 1)
-            self.assertEqual(tip_lines[0].price_unit, 10.0)
-            
-            # Verify payment includes tip
-            payment = order.payment_ids[0]
-            self.assertEqual(payment.amount, 65.0)
+            }))
+        
+        orders = self.env['pos.order'].create_from_ui([tip_order_data])
+        order = orders[0]
+        
+        # Verify tip handling
+        self.assertEqual(order.amount_total, 65.0)
+        
+        # Check if tip line exists
+        tip_lines = order.lines.filtered(
+            lambda l: l.product_id == self.pos_config.tip_product_id
+        )
+        self.assertEqual(len(tip_lines), 1)
+        self.assertEqual(tip_lines[0].price_unit, 10.0)
+        
+        # Verify payment includes tip
+        payment = order.payment_ids[0]
+        self.assertEqual(payment.amount, 65.0)
     
-    def _create_tip_product(self):
+    @classmethod
+    def _create_tip_product(cls):
         """Helper to create tip product"""
-        return self.env['product.product'].create({
+        return cls.env['product.product'].create({
             'name': 'Tip',
             'type': 'service',
             'list_price': 0.0,
             'available_in_pos': True,
-            'categ_id': self.env.ref('product.product_category_all').id,
+            'categ_id': cls.cat_all.id,
         })
     
-    def _create_beverage_category(self):
+    @classmethod
+    def _create_beverage_category(cls):
         """Helper to create beverage category"""
-        return self.env['product.category'].create({
+        return cls.env['product.category'].create({
             'name': 'Beverages',
-            'parent_id': self.env.ref('product.product_category_all').id,
+            'parent_id': cls.cat_all.id,
         })
     
-    def _create_food_category(self):
+    @classmethod
+    def _create_food_category(cls):
         """Helper to create food category"""
-        return self.env['product.category'].create({
+        return cls.env['product.category'].create({
             'name': 'Food',
-            'parent_id': self.env.ref('product.product_category_all').id,
+            'parent_id': cls.cat_all.id,
         })
     
     def _create_account_payment_method(self):
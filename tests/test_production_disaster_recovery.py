@@ -1,410 +1,480 @@
 # -*- coding: utf-8 -*-
 
-import json
-import time
-import tempfile
-import shutil
+from contextlib import ExitStack, contextmanager
 from datetime import datetime, timedelta
-from unittest.mock import patch, MagicMock, Mock
-from pathlib import Path
+from unittest.mock import create_autospec, patch
 
-from odoo.tests.common import TransactionCase
-from odoo.exceptions import ValidationError, UserError
+from odoo.tests import tagged
 
+from .common import ProductionTestCommon, ResultSpecMixin, freeze
 
-class TestProductionDisasterRecovery(TransactionCase):
+
+# Canned hook results are built once at import and frozen, so tests can share
+# them without copying
+_FIXED_TS = '2024-12-25T00:00:00'
+_PIT_RECOVERY_POINT = datetime.fromisoformat(_FIXED_TS) - timedelta(hours=2)
+
+_DB_FULL_BACKUP_RESULT = freeze({
+    'backup_id': 'DB-BACKUP-001',
+    'backup_type': 'full',
+    'backup_size': '2.5GB',
+    'backup_location': '/backups/db/full_backup_20241225.sql',
+    'backup_timestamp': _FIXED_TS,
+    'backup_duration': '15_minutes',
+    'compression_enabled': True,
+    'encryption_enabled': True,
+    'integrity_verified': True
+})
+
+_DB_INCREMENTAL_BACKUP_RESULT = freeze({
+    'backup_id': 'DB-BACKUP-002',
+    'backup_type': 'incremental',
+    'backup_size': '150MB',
+    'backup_location': '/backups/db/incremental_backup_20241225.sql',
+    'backup_timestamp': _FIXED_TS,
+    'backup_duration': '3_minutes',
+    'base_backup_id': 'DB-BACKUP-001'
+})
+
+_BACKUP_VERIFICATION_RESULT = freeze({
+    'verification_successful': True,
+    'backup_id': 'DB-BACKUP-001',
+    'checksum_verified': True,
+    'structure_validated': True,
+    'data_consistency_checked': True,
+    'verification_timestamp': _FIXED_TS
+})
+
+_CONFIG_BACKUP_RESULT = freeze({
+    'backup_id': 'CONFIG-BACKUP-001',
+    'configuration_items': [
+        'payment_provider_settings',
+        'webhook_configurations',
+        'security_settings',
+        'user_permissions',
+        'system_parameters'
+    ],
+    'backup_location': '/backups/config/system_config_20241225.json',
+    'backup_timestamp': _FIXED_TS,
+    'encryption_enabled': True
+})
+
+_PROVIDER_BACKUP_RESULT = freeze({
+    'backup_id': 'PROVIDER-BACKUP-001',
+    'configuration_data': {
+        'merchant_serial_number': '654321',
+        'environment': 'production',
+        'webhook_url': 'https://example.com/webhook',
+        'payment_methods_enabled': ['vipps', 'mobilepay'],
+        'security_settings': 'encrypted'
+    },
+    'backup_timestamp': _FIXED_TS
+})
+
+_DB_RESTORE_RESULT = freeze({
+    'recovery_id': 'RECOVERY-001',
+    'backup_id': 'DB-BACKUP-001',
+    'recovery_type': 'full',
+    'recovery_status': 'successful',
+    'recovery_duration': '25_minutes',
+    'records_restored': 50000,
+    'data_integrity_verified': True,
+    'recovery_timestamp': _FIXED_TS
+})
+
+_PIT_RESTORE_RESULT = freeze({
+    'recovery_id': 'PIT-RECOVERY-001',
+    'recovery_point': _PIT_RECOVERY_POINT.isoformat(),
+    'recovery_status': 'successful',
+    'recovery_method': 'transaction_log_replay',
+    'transactions_replayed': 1500,
+    'recovery_duration': '18_minutes',
+    'data_consistency_verified': True
+})
+
+_SELECTIVE_RESTORE_RESULT = freeze({
+    'recovery_id': 'SELECTIVE-RECOVERY-001',
+    'recovery_scope': ['payment_transactions', 'customer_data'],
+    'recovery_status': 'successful',
+    'records_restored': {
+        'payment_transactions': 1200,
+        'customer_data': 800
+    },
+    'recovery_duration': '12_minutes'
+})
+
+_DR_PLAN_RESULT = freeze({
+    'dr_plan_id': 'DR-PLAN-001',
+    'disaster_type': 'complete_system_failure',
+    'recovery_status': 'in_progress',
+    'estimated_recovery_time': '4_hours',
+    'recovery_steps': [
+        'activate_backup_systems',
+        'restore_database',
+        'restore_configurations',
+        'validate_system_integrity',
+        'resume_operations'
+    ],
+    'current_step': 'restore_database',
+    'completion_percentage': 40
+})
+
+_CORRUPTION_RECOVERY_RESULT = freeze({
+    'recovery_id': 'CORRUPTION-RECOVERY-001',
+    'corruption_type': 'payment_transaction_corruption',
+    'affected_records': 150,
+    'recovery_method': 'backup_restoration',
+    'recovery_status': 'successful',
+    'data_integrity_restored': True,
+    'recovery_duration': '45_minutes'
+})
+
+_NETWORK_RECOVERY_RESULT = freeze({
+    'recovery_id': 'NETWORK-RECOVERY-001',
+    'failure_type': 'external_api_connectivity',
+    'recovery_actions': [
+        'switch_to_backup_endpoints',
+        'enable_offline_mode',
+        'queue_pending_transactions',
+        'monitor_connectivity_restoration'
+    ],
+    'recovery_status': 'successful',
+    'service_degradation': 'minimal',
+    'estimated_full_recovery': '2_hours'
+})
+
+_FAILOVER_RESULT = freeze({
+    'failover_id': 'FAILOVER-001',
+    'failover_type': 'automatic',
+    'primary_system': 'production_server_1',
+    'backup_system': 'production_server_2',
+    'failover_duration': '3_minutes',
+    'service_interruption': '30_seconds',
+    'failover_status': 'successful',
+    'data_synchronization_verified': True
+})
+
+_LOAD_BALANCING_RESULT = freeze({
+    'load_balancing_id': 'LB-001',
+    'active_servers': ['server_1', 'server_2', 'server_3'],
+    'traffic_distribution': {
+        'server_1': '40%',
+        'server_2': '35%',
+        'server_3': '25%'
+    },
+    'response_time_improvement': '35%',
+    'system_stability': 'excellent'
+})
+
+_DEGRADED_MODE_RESULT = freeze({
+    'degraded_mode_id': 'DEGRADED-001',
+    'enabled_features': [
+        'basic_payment_processing',
+        'transaction_logging',
+        'essential_webhooks'
+    ],
+    'disabled_features': [
+        'advanced_analytics',
+        'real_time_reporting',
+        'non_essential_integrations'
+    ],
+    'performance_impact': '15%',
+    'estimated_duration': '2_hours'
+})
+
+_RETENTION_RESULT = freeze({
+    'retention_policy_id': 'RETENTION-001',
+    'retention_rules': {
+        'daily_backups': '30_days',
+        'weekly_backups': '12_weeks',
+        'monthly_backups': '12_months',
+        'yearly_backups': '7_years'
+    },
+    'backups_retained': 156,
+    'backups_archived': 45,
+    'backups_deleted': 12,
+    'storage_optimized': True,
+    'compliance_maintained': True
+})
+
+_CLEANUP_RESULT = freeze({
+    'cleanup_id': 'CLEANUP-001',
+    'expired_backups_found': 25,
+    'backups_deleted': 25,
+    'storage_freed': '2.8GB',
+    'cleanup_duration': '8_minutes',
+    'cleanup_successful': True
+})
+
+_DR_PLAN_VALIDATION_RESULT = freeze({
+    'dr_plan_id': 'DR-PLAN-001',
+    'validation_status': 'passed',
+    'plan_completeness': 95,
+    'identified_gaps': [
+        'network_redundancy_documentation_update_needed'
+    ],
+    'recommended_improvements': [
+        'add_automated_failover_testing',
+        'update_contact_information'
+    ],
+    'last_validation_date': _FIXED_TS
+})
+
+_DR_DRILL_RESULT = freeze({
+    'drill_id': 'DR-DRILL-001',
+    'drill_type': 'full_system_recovery',
+    'drill_status': 'completed',
+    'drill_duration': '3_hours_45_minutes',
+    'objectives_met': 8,
+    'total_objectives': 10,
+    'success_rate': 80,
+    'lessons_learned': [
+        'backup_restoration_faster_than_expected',
+        'communication_protocols_need_improvement'
+    ],
+    'action_items': [
+        'update_communication_tree',
+        'optimize_database_restoration_process'
+    ]
+})
+
+_RECOVERY_VALIDATION_RESULT = freeze({
+    'validation_id': 'RECOVERY-VALIDATION-001',
+    'recovery_completeness': 98,
+    'data_integrity_score': 100,
+    'system_functionality_score': 95,
+    'performance_score': 92,
+    'validation_checks_passed': 47,
+    'validation_checks_total': 50,
+    'critical_issues': 0,
+    'minor_issues': 3,
+    'validation_successful': True
+})
+
+_RTO_RESULTS = {
+    system: freeze({
+        'system': system,
+        'rto_target': rto_target,
+        'actual_recovery_time': rto_target - 2,  # 2 minutes under target
+        'rto_met': True,
+        'recovery_steps_completed': 5,
+        'test_timestamp': _FIXED_TS
+    })
+    for system, rto_target in (
+        ('payment_processing', 15),
+        ('database', 30),
+        ('webhook_processing', 10),
+        ('user_interface', 5),
+    )
+}
+
+_RPO_RESULTS = {
+    data_type: freeze({
+        'data_type': data_type,
+        'rpo_target': rpo_target,
+        'actual_data_loss': rpo_target - 1,  # 1 minute better than target
+        'rpo_met': True,
+        'last_backup_timestamp': _FIXED_TS,
+        'data_consistency_verified': True
+    })
+    for data_type, rpo_target in (
+        ('payment_transactions', 5),
+        ('customer_data', 15),
+        ('configuration_data', 60),
+        ('audit_logs', 1),
+    )
+}
+
+
+# Opt-in only: odoo-bin --test-tags=disaster_recovery_mock -i mobilepay_vipps
+@tagged('-standard', 'post_install', '-at_install', 'disaster_recovery_mock')
+class TestProductionDisasterRecovery(ResultSpecMixin, ProductionTestCommon):
     """Production disaster recovery and backup testing"""
     
-    def setUp(self):
-        super().setUp()
-        
-        # Create production-like test company
-        self.company = self.env['res.company'].create({
-            'name': 'Production DR Test Company',
-            'currency_id': self.env.ref('base.NOK').id,
-        })
-        
-        # Create production payment provider
-        self.provider = self.env['payment.provider'].create({
-            'name': 'Vipps Production DR',
-            'code': 'vipps',
-            'state': 'enabled',
-            'company_id': self.company.id,
-            'vipps_merchant_serial_number': '654321',
-            'vipps_subscription_key': 'prod_subscription_key_12345678901234567890',
-            'vipps_client_id': 'prod_client_id_12345',
-            'vipps_client_secret': 'prod_client_secret_12345678901234567890',
-            'vipps_environment': 'production',
-            'vipps_webhook_secret': 'prod_webhook_secret_12345678901234567890123456789012',
-        })
-        
-        # Create test data for backup/recovery testing
-        self.test_customers = []
-        for i in range(10):
-            customer = self.env['res.partner'].create({
-                'name': f'DR Test Customer {i+1}',
-                'email': f'dr.customer.{i+1}@example.com',
-                'phone': f'+471234567{i}',
-            })
-            self.test_customers.append(customer)
-        
-        # Create test transactions
-        self.test_transactions = []
-        for i, customer in enumerate(self.test_customers):
-            transaction = self.env['payment.transaction'].create({
-                'reference': f'DR-TEST-{i+1:03d}',
-                'amount': 100.0 + (i * 10),
-                'currency_id': self.company.currency_id.id,
-                'partner_id': customer.id,
-                'provider_id': self.provider.id,
-                'state': 'done',
-            })
-            self.test_transactions.append(transaction)
+    @contextmanager
+    def _stub(self, obj, name, value):
+        """Make obj's model method name return value for the duration of the block"""
+        model_class = type(obj)
+        original = model_class.__dict__.get(name)
+        setattr(model_class, name, lambda self, *args, **kwargs: value)
+        try:
+            yield
+        finally:
+            if original is None:
+                delattr(model_class, name)
+            else:
+                setattr(model_class, name, original)
+    
+    @contextmanager
+    def _stub_all(self, stubs):
+        """Stub every provider hook in stubs (name -> result) for the duration of the block"""
+        with ExitStack() as stack:
+            for name, value in stubs.items():
+                stack.enter_context(self._stub(self.provider, name, value))
+            yield
+    
+    def _check_hook(self, method_name, args, spec):
+        """Call the provider hook with args and check its result against spec"""
+        result = getattr(self.provider, method_name)(*args)
+        self._assert_result(result, spec)
+        return result
     
     def test_database_backup_procedures(self):
         """Test database backup procedures"""
-        # Test full database backup
-        with patch.object(self.provider, '_create_database_backup') as mock_backup:
-            mock_backup.return_value = {
-                'backup_id': 'DB-BACKUP-001',
-                'backup_type': 'full',
-                'backup_size': '2.5GB',
-                'backup_location': '/backups/db/full_backup_20241225.sql',
-                'backup_timestamp': datetime.now().isoformat(),
-                'backup_duration': '15_minutes',
-                'compression_enabled': True,
-                'encryption_enabled': True,
-                'integrity_verified': True
-            }
-            
+        # Test full then incremental backup through one mock answering in call
+        # order; autospec enforces the (self, backup_type) signature, so a call
+        # with the wrong arguments raises TypeError
+        mock_backup = create_autospec(lambda self, backup_type: None,
+                                      side_effect=[_DB_FULL_BACKUP_RESULT, _DB_INCREMENTAL_BACKUP_RESULT])
+        with patch.object(type(self.provider), '_create_database_backup', create=True, new=mock_backup):
             backup_result = self.provider._create_database_backup('full')
-            
-            # Verify backup creation
-            self.assertEqual(backup_result['backup_type'], 'full')
-            self.assertTrue(backup_result['integrity_verified'])
-            self.assertTrue(backup_result['encryption_enabled'])
-            mock_backup.assert_called_once_with('full')
-        
-        # Test incremental backup
-        with patch.object(self.provider, '_create_database_backup') as mock_backup:
-            mock_backup.return_value = {
-                'backup_id': 'DB-BACKUP-002',
-                'backup_type': 'incremental',
-                'backup_size': '150MB',
-                'backup_location': '/backups/db/incremental_backup_20241225.sql',
-                'backup_timestamp': datetime.now().isoformat(),
-                'backup_duration': '3_minutes',
-                'base_backup_id': 'DB-BACKUP-001'
-            }
-            
             incremental_result = self.provider._create_database_backup('incremental')
-            
-            self.assertEqual(incremental_result['backup_type'], 'incremental')
-            self.assertIn('base_backup_id', incremental_result)
+        
+        # Verify backup creation
+        self._assert_result(backup_result, {
+            'backup_type': 'full',
+            'integrity_verified': True,
+            'encryption_enabled': True,
+        })
+        self._assert_result(incremental_result, {
+            'backup_type': 'incremental',
+            'base_backup_id': 'DB-BACKUP-001',
+        })
+        self.assertEqual([call.args for call in mock_backup.call_args_list],
+                         [(self.provider, 'full'), (self.provider, 'incremental')])
         
         # Test backup verification
-        with patch.object(self.provider, '_verify_backup_integrity') as mock_verify:
-            mock_verify.return_value = {
+        with self._stub(self.provider, '_verify_backup_integrity', _BACKUP_VERIFICATION_RESULT):
+            self._check_hook('_verify_backup_integrity', ('DB-BACKUP-001',), {
                 'verification_successful': True,
-                'backup_id': 'DB-BACKUP-001',
                 'checksum_verified': True,
-                'structure_validated': True,
                 'data_consistency_checked': True,
-                'verification_timestamp': datetime.now().isoformat()
-            }
-            
-            verification_result = self.provider._verify_backup_integrity('DB-BACKUP-001')
-            
-            self.assertTrue(verification_result['verification_successful'])
-            self.assertTrue(verification_result['checksum_verified'])
-            self.assertTrue(verification_result['data_consistency_checked'])
+            })
     
     def test_configuration_backup_procedures(self):
         """Test configuration backup procedures"""
-        # Test system configuration backup
-        with patch.object(self.provider, '_backup_system_configuration') as mock_config_backup:
-            mock_config_backup.return_value = {
-                'backup_id': 'CONFIG-BACKUP-001',
-                'configuration_items': [
-                    'payment_provider_settings',
-                    'webhook_configurations',
-                    'security_settings',
-                    'user_permissions',
-                    'system_parameters'
-                ],
-                'backup_location': '/backups/config/system_config_20241225.json',
-                'backup_timestamp': datetime.now().isoformat(),
-                'encryption_enabled': True
-            }
-            
-            config_result = self.provider._backup_system_configuration()
-            
-            self.assertEqual(len(config_result['configuration_items']), 5)
-            self.assertTrue(config_result['encryption_enabled'])
-            mock_config_backup.assert_called_once()
-        
-        # Test payment provider configuration backup
-        with patch.object(self.provider, '_backup_provider_configuration') as mock_provider_backup:
-            mock_provider_backup.return_value = {
-                'backup_id': 'PROVIDER-BACKUP-001',
-                'provider_id': self.provider.id,
-                'configuration_data': {
-                    'merchant_serial_number': '654321',
-                    'environment': 'production',
-                    'webhook_url': 'https://example.com/webhook',
-                    'payment_methods_enabled': ['vipps', 'mobilepay'],
-                    'security_settings': 'encrypted'
-                },
-                'backup_timestamp': datetime.now().isoformat()
-            }
-            
-            provider_result = self.provider._backup_provider_configuration()
+        with self._stub_all({
+            '_backup_system_configuration': _CONFIG_BACKUP_RESULT,
+            '_backup_provider_configuration': {
+                **_PROVIDER_BACKUP_RESULT,
+                'provider_id': self.provider_id,
+            },
+        }):
+            # Test system configuration backup
+            self._check_hook('_backup_system_configuration', (), {
+                'configuration_items': ('len', 5),
+                'encryption_enabled': True,
+            })
             
-            self.assertEqual(provider_result['provider_id'], self.provider.id)
-            self.assertIn('configuration_data', provider_result)
+            # Test payment provider configuration backup
+            self._check_hook('_backup_provider_configuration', (), {
+                'provider_id': self.provider_id,
+                'configuration_data': ('len>', 0),
+            })
     
     def test_data_recovery_procedures(self):
         """Test data recovery procedures"""
-        # Test database recovery from full backup
-        with patch.object(self.provider, '_restore_database_from_backup') as mock_restore:
-            mock_restore.return_value = {
-                'recovery_id': 'RECOVERY-001',
-                'backup_id': 'DB-BACKUP-001',
-                'recovery_type': 'full',
+        with self._stub_all({
+            '_restore_database_from_backup': _DB_RESTORE_RESULT,
+            '_restore_to_point_in_time': _PIT_RESTORE_RESULT,
+            '_restore_selective_data': _SELECTIVE_RESTORE_RESULT,
+        }):
+            # Test database recovery from full backup
+            self._check_hook('_restore_database_from_backup', ('DB-BACKUP-001',), {
                 'recovery_status': 'successful',
-                'recovery_duration': '25_minutes',
-                'records_restored': 50000,
                 'data_integrity_verified': True,
-                'recovery_timestamp': datetime.now().isoformat()
-            }
-            
-            recovery_result = self.provider._restore_database_from_backup('DB-BACKUP-001')
+                'records_restored': ('>', 0),
+            })
             
-            self.assertEqual(recovery_result['recovery_status'], 'successful')
-            self.assertTrue(recovery_result['data_integrity_verified'])
-            self.assertGreater(recovery_result['records_restored'], 0)
-            mock_restore.assert_called_once_with('DB-BACKUP-001')
-        
-        # Test point-in-time recovery
-        recovery_point = datetime.now() - timedelta(hours=2)
-        
-        with patch.object(self.provider, '_restore_to_point_in_time') as mock_pit_restore:
-            mock_pit_restore.return_value = {
-                'recovery_id': 'PIT-RECOVERY-001',
-                'recovery_point': recovery_point.isoformat(),
+            # Test point-in-time recovery
+            self._check_hook('_restore_to_point_in_time', (_PIT_RECOVERY_POINT,), {
                 'recovery_status': 'successful',
-                'recovery_method': 'transaction_log_replay',
-                'transactions_replayed': 1500,
-                'recovery_duration': '18_minutes',
-                'data_consistency_verified': True
-            }
-            
-            pit_result = self.provider._restore_to_point_in_time(recovery_point)
+                'data_consistency_verified': True,
+                'transactions_replayed': ('>', 0),
+            })
             
-            self.assertEqual(pit_result['recovery_status'], 'successful')
-            self.assertTrue(pit_result['data_consistency_verified'])
-            self.assertGreater(pit_result['transactions_replayed'], 0)
-        
-        # Test selective data recovery
-        with patch.object(self.provider, '_restore_selective_data') as mock_selective:
-            mock_selective.return_value = {
-                'recovery_id': 'SELECTIVE-RECOVERY-001',
-                'recovery_scope': ['payment_transactions', 'customer_data'],
+            # Test selective data recovery
+            self._check_hook('_restore_selective_data', (['payment_transactions', 'customer_data'],), {
                 'recovery_status': 'successful',
-                'records_restored': {
-                    'payment_transactions': 1200,
-                    'customer_data': 800
-                },
-                'recovery_duration': '12_minutes'
-            }
-            
-            selective_result = self.provider._restore_selective_data(['payment_transactions', 'customer_data'])
-            
-            self.assertEqual(selective_result['recovery_status'], 'successful')
-            self.assertIn('payment_transactions', selective_result['records_restored'])
-            self.assertIn('customer_data', selective_result['records_restored'])
+                'records_restored': ('has', ('payment_transactions', 'customer_data')),
+            })
     
     def test_disaster_recovery_scenarios(self):
         """Test various disaster recovery scenarios"""
-        # Test complete system failure recovery
-        with patch.object(self.provider, '_execute_disaster_recovery_plan') as mock_dr_plan:
-            mock_dr_plan.return_value = {
-                'dr_plan_id': 'DR-PLAN-001',
+        with self._stub_all({
+            '_execute_disaster_recovery_plan': _DR_PLAN_RESULT,
+            '_recover_from_data_corruption': _CORRUPTION_RECOVERY_RESULT,
+            '_recover_from_network_failure': _NETWORK_RECOVERY_RESULT,
+        }):
+            # Test complete system failure recovery
+            self._check_hook('_execute_disaster_recovery_plan', ('complete_system_failure',), {
                 'disaster_type': 'complete_system_failure',
-                'recovery_status': 'in_progress',
-                'estimated_recovery_time': '4_hours',
-                'recovery_steps': [
-                    'activate_backup_systems',
-                    'restore_database',
-                    'restore_configurations',
-                    'validate_system_integrity',
-                    'resume_operations'
-                ],
-                'current_step': 'restore_database',
-                'completion_percentage': 40
-            }
-            
-            dr_result = self.provider._execute_disaster_recovery_plan('complete_system_failure')
+                'recovery_steps': ('len', 5),
+                'completion_percentage': ('>', 0),
+            })
             
-            self.assertEqual(dr_result['disaster_type'], 'complete_system_failure')
-            self.assertEqual(len(dr_result['recovery_steps']), 5)
-            self.assertGreater(dr_result['completion_percentage'], 0)
-        
-        # Test data corruption recovery
-        with patch.object(self.provider, '_recover_from_data_corruption') as mock_corruption_recovery:
-            mock_corruption_recovery.return_value = {
-                'recovery_id': 'CORRUPTION-RECOVERY-001',
-                'corruption_type': 'payment_transaction_corruption',
-                'affected_records': 150,
-                'recovery_method': 'backup_restoration',
+            # Test data corruption recovery
+            self._check_hook('_recover_from_data_corruption', ('payment_transaction_corruption',), {
                 'recovery_status': 'successful',
                 'data_integrity_restored': True,
-                'recovery_duration': '45_minutes'
-            }
-            
-            corruption_result = self.provider._recover_from_data_corruption('payment_transaction_corruption')
+                'affected_records': ('>', 0),
+            })
             
-            self.assertEqual(corruption_result['recovery_status'], 'successful')
-            self.assertTrue(corruption_result['data_integrity_restored'])
-            self.assertGreater(corruption_result['affected_records'], 0)
-        
-        # Test network failure recovery
-        with patch.object(self.provider, '_recover_from_network_failure') as mock_network_recovery:
-            mock_network_recovery.return_value = {
-                'recovery_id': 'NETWORK-RECOVERY-001',
-                'failure_type': 'external_api_connectivity',
-                'recovery_actions': [
-                    'switch_to_backup_endpoints',
-                    'enable_offline_mode',
-                    'queue_pending_transactions',
-                    'monitor_connectivity_restoration'
-                ],
+            # Test network failure recovery
+            self._check_hook('_recover_from_network_failure', ('external_api_connectivity',), {
                 'recovery_status': 'successful',
                 'service_degradation': 'minimal',
-                'estimated_full_recovery': '2_hours'
-            }
-            
-            network_result = self.provider._recover_from_network_failure('external_api_connectivity')
-            
-            self.assertEqual(network_result['recovery_status'], 'successful')
-            self.assertEqual(network_result['service_degradation'], 'minimal')
-            self.assertEqual(len(network_result['recovery_actions']), 4)
+                'recovery_actions': ('len', 4),
+            })
     
     def test_business_continuity_procedures(self):
         """Test business continuity procedures"""
-        # Test failover to backup systems
-        with patch.object(self.provider, '_execute_failover') as mock_failover:
-            mock_failover.return_value = {
-                'failover_id': 'FAILOVER-001',
-                'failover_type': 'automatic',
-                'primary_system': 'production_server_1',
-                'backup_system': 'production_server_2',
-                'failover_duration': '3_minutes',
-                'service_interruption': '30_seconds',
+        with self._stub_all({
+            '_execute_failover': _FAILOVER_RESULT,
+            '_activate_load_balancing': _LOAD_BALANCING_RESULT,
+            '_enable_degraded_mode': _DEGRADED_MODE_RESULT,
+        }):
+            # Test failover to backup systems
+            self._check_hook('_execute_failover', (), {
                 'failover_status': 'successful',
-                'data_synchronization_verified': True
-            }
-            
-            failover_result = self.provider._execute_failover()
-            
-            self.assertEqual(failover_result['failover_status'], 'successful')
-            self.assertTrue(failover_result['data_synchronization_verified'])
-            self.assertEqual(failover_result['failover_type'], 'automatic')
-        
-        # Test load balancing during high traffic
-        with patch.object(self.provider, '_activate_load_balancing') as mock_load_balance:
-            mock_load_balance.return_value = {
-                'load_balancing_id': 'LB-001',
-                'active_servers': ['server_1', 'server_2', 'server_3'],
-                'traffic_distribution': {
-                    'server_1': '40%',
-                    'server_2': '35%',
-                    'server_3': '25%'
-                },
-                'response_time_improvement': '35%',
-                'system_stability': 'excellent'
-            }
-            
-            lb_result = self.provider._activate_load_balancing()
-            
-            self.assertEqual(len(lb_result['active_servers']), 3)
-            self.assertIn('traffic_distribution', lb_result)
-            self.assertEqual(lb_result['system_stability'], 'excellent')
-        
-        # Test degraded mode operations
-        with patch.object(self.provider, '_enable_degraded_mode') as mock_degraded:
-            mock_degraded.return_value = {
-                'degraded_mode_id': 'DEGRADED-001',
-                'enabled_features': [
-                    'basic_payment_processing',
-                    'transaction_logging',
-                    'essential_webhooks'
-                ],
-                'disabled_features': [
-                    'advanced_analytics',
-                    'real_time_reporting',
-                    'non_essential_integrations'
-                ],
-                'performance_impact': '15%',
-                'estimated_duration': '2_hours'
-            }
+                'data_synchronization_verified': True,
+                'failover_type': 'automatic',
+            })
             
-            degraded_result = self.provider._enable_degraded_mode()
+            # Test load balancing during high traffic
+            self._check_hook('_activate_load_balancing', (), {
+                'active_servers': ('len', 3),
+                'traffic_distribution': ('len>', 0),
+                'system_stability': 'excellent',
+            })
             
-            self.assertGreater(len(degraded_result['enabled_features']), 0)
-            self.assertGreater(len(degraded_result['disabled_features']), 0)
+            # Test degraded mode operations
+            degraded_result = self._check_hook('_enable_degraded_mode', (), {
+                'enabled_features': ('len>', 0),
+                'disabled_features': ('len>', 0),
+            })
             self.assertLess(int(degraded_result['performance_impact'].rstrip('%')), 20)
     
     def test_recovery_time_objectives(self):
         """Test Recovery Time Objectives (RTO) compliance"""
-        # Test RTO for critical systems
-        critical_systems = [
-            {'system': 'payment_processing', 'rto_target': 15, 'unit': 'minutes'},
-            {'system': 'database', 'rto_target': 30, 'unit': 'minutes'},
-            {'system': 'webhook_processing', 'rto_target': 10, 'unit': 'minutes'},
-            {'system': 'user_interface', 'rto_target': 5, 'unit': 'minutes'}
-        ]
-        
-        for system in critical_systems:
-            with self.subTest(system=system['system']):
-                with patch.object(self.provider, '_test_recovery_time') as mock_rto_test:
-                    mock_rto_test.return_value = {
-                        'system': system['system'],
-                        'rto_target': system['rto_target'],
-                        'actual_recovery_time': system['rto_target'] - 2,  # 2 minutes under target
-                        'rto_met': True,
-                        'recovery_steps_completed': 5,
-                        'test_timestamp': datetime.now().isoformat()
-                    }
-                    
-                    rto_result = self.provider._test_recovery_time(system['system'])
+        # Test RTO for critical systems (minutes); one patch answers every system
+        with patch.object(type(self.provider), '_test_recovery_time', create=True,
+                          new=lambda provider, system: _RTO_RESULTS[system]):
+            for system in _RTO_RESULTS:
+                with self.subTest(system=system):
+                    rto_result = self.provider._test_recovery_time(system)
                     
                     self.assertTrue(rto_result['rto_met'])
                     self.assertLess(rto_result['actual_recovery_time'], rto_result['rto_target'])
     
     def test_recovery_point_objectives(self):
         """Test Recovery Point Objectives (RPO) compliance"""
-        # Test RPO for different data types
-        data_types = [
-            {'type': 'payment_transactions', 'rpo_target': 5, 'unit': 'minutes'},
-            {'type': 'customer_data', 'rpo_target': 15, 'unit': 'minutes'},
-            {'type': 'configuration_data', 'rpo_target': 60, 'unit': 'minutes'},
-            {'type': 'audit_logs', 'rpo_target': 1, 'unit': 'minutes'}
-        ]
-        
-        for data_type in data_types:
-            with self.subTest(data_type=data_type['type']):
-                with patch.object(self.provider, '_test_recovery_point') as mock_rpo_test:
-                    mock_rpo_test.return_value = {
-                        'data_type': data_type['type'],
-                        'rpo_target': data_type['rpo_target'],
-                        'actual_data_loss': data_type['rpo_target'] - 1,  # 1 minute better than target
-                        'rpo_met': True,
-                        'last_backup_timestamp': datetime.now().isoformat(),
-                        'data_consistency_verified': True
-                    }
-                    
-                    rpo_result = self.provider._test_recovery_point(data_type['type'])
+        # Test RPO for different data types (minutes); one patch answers every type
+        with patch.object(type(self.provider), '_test_recovery_point', create=True,
+                          new=lambda provider, data_type: _RPO_RESULTS[data_type]):
+            for data_type in _RPO_RESULTS:
+                with self.subTest(data_type=data_type):
+                    rpo_result = self.provider._test_recovery_point(data_type)
                     
                     self.assertTrue(rpo_result['rpo_met'])
                     self.assertTrue(rpo_result['data_consistency_verified'])
@@ -412,114 +482,49 @@ class TestProductionDisasterRecovery(TransactionCase):
     
     def test_backup_retention_policies(self):
         """Test backup retention policies"""
-        # Test retention policy enforcement
-        with patch.object(self.provider, '_enforce_backup_retention') as mock_retention:
-            mock_retention.return_value = {
-                'retention_policy_id': 'RETENTION-001',
-                'retention_rules': {
-                    'daily_backups': '30_days',
-                    'weekly_backups': '12_weeks',
-                    'monthly_backups': '12_months',
-                    'yearly_backups': '7_years'
-                },
-                'backups_retained': 156,
-                'backups_archived': 45,
-                'backups_deleted': 12,
+        with self._stub_all({
+            '_enforce_backup_retention': _RETENTION_RESULT,
+            '_cleanup_expired_backups': _CLEANUP_RESULT,
+        }):
+            # Test retention policy enforcement
+            self._check_hook('_enforce_backup_retention', (), {
+                'compliance_maintained': True,
                 'storage_optimized': True,
-                'compliance_maintained': True
-            }
-            
-            retention_result = self.provider._enforce_backup_retention()
-            
-            self.assertTrue(retention_result['compliance_maintained'])
-            self.assertTrue(retention_result['storage_optimized'])
-            self.assertGreater(retention_result['backups_retained'], 0)
-        
-        # Test backup cleanup procedures
-        with patch.object(self.provider, '_cleanup_expired_backups') as mock_cleanup:
-            mock_cleanup.return_value = {
-                'cleanup_id': 'CLEANUP-001',
-                'expired_backups_found': 25,
-                'backups_deleted': 25,
-                'storage_freed': '2.8GB',
-                'cleanup_duration': '8_minutes',
-                'cleanup_successful': True
-            }
-            
-            cleanup_result = self.provider._cleanup_expired_backups()
+                'backups_retained': ('>', 0),
+            })
             
-            self.assertTrue(cleanup_result['cleanup_successful'])
+            # Test backup cleanup procedures
+            cleanup_result = self._check_hook('_cleanup_expired_backups', (), {
+                'cleanup_successful': True,
+            })
             self.assertEqual(cleanup_result['expired_backups_found'], cleanup_result['backups_deleted'])
             self.assertGreater(float(cleanup_result['storage_freed'].rstrip('GB')), 0)
     
     def test_disaster_recovery_testing(self):
         """Test disaster recovery testing procedures"""
-        # Test DR plan validation
-        with patch.object(self.provider, '_validate_dr_plan') as mock_validate_dr:
-            mock_validate_dr.return_value = {
-                'dr_plan_id': 'DR-PLAN-001',
+        with self._stub_all({
+            '_validate_dr_plan': _DR_PLAN_VALIDATION_RESULT,
+            '_execute_dr_drill': _DR_DRILL_RESULT,
+            '_validate_recovery_completeness': _RECOVERY_VALIDATION_RESULT,
+        }):
+            # Test DR plan validation
+            self._check_hook('_validate_dr_plan', (), {
                 'validation_status': 'passed',
-                'plan_completeness': 95,
-                'identified_gaps': [
-                    'network_redundancy_documentation_update_needed'
-                ],
-                'recommended_improvements': [
-                    'add_automated_failover_testing',
-                    'update_contact_information'
-                ],
-                'last_validation_date': datetime.now().isoformat()
-            }
-            
-            validation_result = self.provider._validate_dr_plan()
+                'plan_completeness': ('>', 90),
+                'identified_gaps': ('isinstance', tuple),
+            })
             
-            self.assertEqual(validation_result['validation_status'], 'passed')
-            self.assertGreater(validation_result['plan_completeness'], 90)
-            self.assertIsInstance(validation_result['identified_gaps'], list)
-        
-        # Test DR drill execution
-        with patch.object(self.provider, '_execute_dr_drill') as mock_dr_drill:
-            mock_dr_drill.return_value = {
-                'drill_id': 'DR-DRILL-001',
-                'drill_type': 'full_system_recovery',
+            # Test DR drill execution
+            self._check_hook('_execute_dr_drill', ('full_system_recovery',), {
                 'drill_status': 'completed',
-                'drill_duration': '3_hours_45_minutes',
-                'objectives_met': 8,
-                'total_objectives': 10,
-                'success_rate': 80,
-                'lessons_learned': [
-                    'backup_restoration_faster_than_expected',
-                    'communication_protocols_need_improvement'
-                ],
-                'action_items': [
-                    'update_communication_tree',
-                    'optimize_database_restoration_process'
-                ]
-            }
-            
-            drill_result = self.provider._execute_dr_drill('full_system_recovery')
+                'success_rate': ('>', 75),
+                'objectives_met': ('>', 0),
+            })
             
-            self.assertEqual(drill_result['drill_status'], 'completed')
-            self.assertGreater(drill_result['success_rate'], 75)
-            self.assertGreater(drill_result['objectives_met'], 0)
-        
-        # Test recovery validation
-        with patch.object(self.provider, '_validate_recovery_completeness') as mock_validate_recovery:
-            mock_validate_recovery.return_value = {
-                'validation_id': 'RECOVERY-VALIDATION-001',
-                'recovery_completeness': 98,
-                'data_integrity_score': 100,
-                'system_functionality_score': 95,
-                'performance_score': 92,
-                'validation_checks_passed': 47,
-                'validation_checks_total': 50,
+            # Test recovery validation
+            self._check_hook('_validate_recovery_completeness', (), {
+                'validation_successful': True,
                 'critical_issues': 0,
-                'minor_issues': 3,
-                'validation_successful': True
-            }
-            
-            recovery_validation = self.provider._validate_recovery_completeness()
-            
-            self.assertTrue(recovery_validation['validation_successful'])
-            self.assertEqual(recovery_validation['critical_issues'], 0)
-            self.assertGreater(recovery_validation['recovery_completeness'], 95)
-            self.assertEqual(recovery_validation['data_integrity_score'], 100)
\ No newline at end of file
+                'recovery_completeness': ('>', 95),
+                'data_integrity_score': 100,
+            })
\ No newline at end of file